@@ -0,0 +1,28 @@
+"""Password hashing.
+
+Kept free of app and database imports: server.py runs these functions in a
+spawned process pool, and each worker imports only this module.
+"""
+import hashlib
+import hmac
+
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+
+# Argon2id with the OWASP minimum parameters (19 MiB, t=2, p=1)
+password_hasher = PasswordHasher(time_cost=2, memory_cost=19456, parallelism=1)
+
+def hash_password(password: str) -> str:
+    return password_hasher.hash(password)
+
+def verify_password(hashed: str, password: str) -> bool:
+    # Accounts created before the switch to Argon2 hold a bare SHA-256 digest
+    if not hashed.startswith("$argon2"):
+        return hmac.compare_digest(hashed, hashlib.sha256(password.encode()).hexdigest())
+    try:
+        return password_hasher.verify(hashed, password)
+    except (VerificationError, InvalidHashError):
+        return False
+
+def password_needs_rehash(hashed: str) -> bool:
+    return not hashed.startswith("$argon2") or password_hasher.check_needs_rehash(hashed)
@@ -1,29 +1,59 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.responses import JSONResponse, ORJSONResponse, Response, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import AsyncMongoClient, ReturnDocument
+from pymongo.errors import DuplicateKeyError
 import os
+import asyncio
 import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from pydantic import BaseModel, Field, EmailStr
+from pydantic import BaseModel, Field, EmailStr, TypeAdapter
 from typing import List, Optional, Dict, Any
 import uuid
 from datetime import datetime, timezone
 import hashlib
+import time
 import jwt
+from cachetools import TTLCache
 from enum import Enum
 
+from passwords import hash_password, verify_password, password_needs_rehash
+
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+# Async callers multiplex many requests per connection, so the pool can stay
+# well under the driver default of 100. A few warm connections spare the
+# first requests after startup the TCP/TLS/auth handshake. Wire compression
+# only pays off against a remote cluster; enable it via ?compressors= in
+# MONGO_URL there rather than paying the CPU cost against a local mongod.
+client = AsyncMongoClient(
+    mongo_url,
+    minPoolSize=5,
+    maxPoolSize=50,
+    maxIdleTimeMS=60000,
+    serverSelectionTimeoutMS=5000,
+    retryWrites=True,
+)
 db = client[os.environ['DB_NAME']]
 
 # Create the main app without a prefix
-app = FastAPI(title="Café Delights API", description="A comprehensive bakery shop API")
+app = FastAPI(
+    title="Café Delights API",
+    description="A comprehensive bakery shop API",
+    default_response_class=ORJSONResponse,
+)
+
+# Rendered product responses. The catalogue changes rarely and only through
+# create_product, which clears this; other workers see changes within the TTL.
+PRODUCT_CACHE_TTL = 60
+product_cache: TTLCache = TTLCache(maxsize=256, ttl=PRODUCT_CACHE_TTL)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -31,6 +61,19 @@ api_router = APIRouter(prefix="/api")
 # Security
 security = HTTPBearer()
 SECRET_KEY = "your-secret-key-change-in-production"
+SIGNING_KEY = SECRET_KEY.encode()
+TOKEN_LIFETIME = 86400  # 24 hours
+
+# Authenticated users keyed by sha256(token), so repeat requests with the same
+# token skip the JWT decode and the users lookup. Entries never outlive the
+# token's own exp.
+TOKEN_CACHE_TTL = 300
+token_cache: TTLCache = TTLCache(maxsize=10_000, ttl=TOKEN_CACHE_TTL)
+
+# Password hashing is CPU-bound by design, so it runs in a process pool
+# (created at startup) where concurrent logins hash in parallel instead of
+# contending for the GIL.
+password_executor: Optional[ProcessPoolExecutor] = None
 
 # Enums
 class ProductCategory(str, Enum):
@@ -54,7 +97,12 @@ class UserRole(str, Enum):
     CUSTOMER = "customer"
     ADMIN = "admin"
 
+def utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
 # Models
+# Stored models keep their id in the Mongo _id; from_db() and to_db() map
+# between the two.
 class Product(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     name: str
@@ -65,7 +113,16 @@ class Product(BaseModel):
     available: bool = True
     ingredients: List[str] = []
     nutritional_info: Dict[str, Any] = {}
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    created_at: datetime = Field(default_factory=utc_now)
+
+class ProductListItem(BaseModel):
+    id: str
+    name: str
+    description: str
+    price: float
+    category: ProductCategory
+    image_url: str
+    available: bool = True
 
 class ProductCreate(BaseModel):
     name: str
@@ -83,7 +140,7 @@ class User(BaseModel):
     role: UserRole = UserRole.CUSTOMER
     phone: Optional[str] = None
     address: Optional[str] = None
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    created_at: datetime = Field(default_factory=utc_now)
 
 class UserCreate(BaseModel):
     email: EmailStr
@@ -101,6 +158,9 @@ class OrderItem(BaseModel):
     quantity: int
     price: float
     product_name: str
+    # Snapshot of the product at order time, so order views need no lookups
+    category: Optional[ProductCategory] = None
+    image_url: Optional[str] = None
 
 class Order(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -111,11 +171,24 @@ class Order(BaseModel):
     payment_method: str = "card"
     delivery_address: Optional[str] = None
     special_instructions: Optional[str] = None
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
-    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    created_at: datetime = Field(default_factory=utc_now)
+    updated_at: datetime = Field(default_factory=utc_now)
 
-class OrderCreate(BaseModel):
+class OrderSummary(BaseModel):
+    id: str
+    user_id: str
     items: List[OrderItem]
+    total_amount: float
+    status: OrderStatus
+    delivery_address: Optional[str] = None
+    created_at: datetime
+
+class OrderItemCreate(BaseModel):
+    product_id: str
+    quantity: int = Field(..., ge=1)
+
+class OrderCreate(BaseModel):
+    items: List[OrderItemCreate] = Field(..., min_length=1)
     delivery_address: Optional[str] = None
     special_instructions: Optional[str] = None
 
@@ -126,37 +199,100 @@ class Review(BaseModel):
     user_name: str
     rating: int = Field(..., ge=1, le=5)
     comment: str
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    created_at: datetime = Field(default_factory=utc_now)
 
 class ReviewCreate(BaseModel):
     product_id: str
     rating: int = Field(..., ge=1, le=5)
     comment: str
 
+# Projections for list views, so they only pull the fields they return
+PRODUCT_LIST_PROJECTION = {("_id" if name == "id" else name): 1 for name in ProductListItem.model_fields}
+ORDER_LIST_PROJECTION = {("_id" if name == "id" else name): 1 for name in OrderSummary.model_fields}
+
+# Serializers for list responses, built once so each request dumps straight to bytes
+PRODUCT_LIST_ADAPTER = TypeAdapter(List[ProductListItem])
+ORDER_LIST_ADAPTER = TypeAdapter(List[OrderSummary])
+REVIEW_LIST_ADAPTER = TypeAdapter(List[Review])
+
+# Responses
+class PydanticResponse(JSONResponse):
+    """Render a model straight to JSON bytes, skipping jsonable_encoder."""
+
+    def render(self, content: BaseModel) -> bytes:
+        return dump_model(content)
+
 # Utility functions
-def hash_password(password: str) -> str:
-    return hashlib.sha256(password.encode()).hexdigest()
+async def run_password_task(func, *args):
+    # Falls back to the default thread pool if the process pool is not up yet
+    return await asyncio.get_running_loop().run_in_executor(password_executor, func, *args)
+
+def from_db(model_cls, doc: Dict[str, Any]):
+    """Build a model from a stored document without re-validating it.
+
+    Documents are written from validated models, so only client input on the
+    write paths goes through full validation.
+    """
+    doc["id"] = doc.pop("_id")
+    # model_construct does not build nested models, so do the order items
+    # here to get their defaults too
+    if model_cls in (Order, OrderSummary):
+        doc["items"] = [OrderItem.model_construct(**item) for item in doc["items"]]
+    return model_cls.model_construct(**doc)
+
+def to_db(model: BaseModel) -> Dict[str, Any]:
+    """Dump a model as a Mongo document, storing its id as _id."""
+    doc = model.model_dump(exclude_none=True)
+    doc["_id"] = doc.pop("id")
+    return doc
+
+def dump_model(model: BaseModel) -> bytes:
+    # Models built with from_db() skip coercion, so enum fields may hold
+    # their raw string values; that is expected and not worth a warning.
+    return model.model_dump_json(warnings=False).encode()
+
+def dump_list(adapter: TypeAdapter, model_cls, docs: List[Dict[str, Any]]) -> bytes:
+    """Serialize stored documents as a JSON list shaped by model_cls."""
+    return adapter.dump_json([from_db(model_cls, doc) for doc in docs], warnings=False)
 
 def create_token(user_id: str, email: str, role: str) -> str:
     payload = {
         "user_id": user_id,
         "email": email,
         "role": role,
-        "exp": datetime.now(timezone.utc).timestamp() + 86400  # 24 hours
+        "exp": int(time.time()) + TOKEN_LIFETIME
     }
-    return jwt.encode(payload, SECRET_KEY, algorithm="HS256")
+    return jwt.encode(payload, SIGNING_KEY, algorithm="HS256")
+
+def token_key(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
+def invalidate_token(key: bytes) -> None:
+    """Drop a cached token, e.g. on logout or when the user's role changes."""
+    token_cache.pop(key, None)
 
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    key = token_key(credentials.credentials)
+    cached = token_cache.get(key)
+    if cached is not None:
+        user, expires_at = cached
+        if time.time() < expires_at:
+            return user
+        # Expired: fall through so jwt.decode reports it
+        invalidate_token(key)
+
     try:
-        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=["HS256"])
+        payload = jwt.decode(credentials.credentials, SIGNING_KEY, algorithms=["HS256"])
         user_id = payload.get("user_id")
         if user_id is None:
             raise HTTPException(status_code=401, detail="Invalid token")
         
-        user = await db.users.find_one({"id": user_id})
+        user = await db.users.find_one({"_id": user_id})
         if user is None:
             raise HTTPException(status_code=401, detail="User not found")
-        return User(**user)
+        user_obj = from_db(User, user)
+        token_cache[key] = (user_obj, payload["exp"])
+        return user_obj
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expired")
     except jwt.InvalidTokenError:
@@ -169,10 +305,11 @@ async def init_sample_data():
     if existing_products > 0:
         return
     
+    now = utc_now()
     sample_products = [
         # Coffee
         {
-            "id": str(uuid.uuid4()),
+            "_id": str(uuid.uuid4()),
             "name": "Espresso",
             "description": "Rich and bold espresso shot made from premium coffee beans",
             "price": 2.50,
@@ -181,10 +318,10 @@ async def init_sample_data():
             "available": True,
             "ingredients": ["coffee beans", "water"],
             "nutritional_info": {"calories": 5, "caffeine_mg": 63},
-            "created_at": datetime.now(timezone.utc)
+            "created_at": now
         },
         {
-            "id": str(uuid.uuid4()),
+            "_id": str(uuid.uuid4()),
             "name": "Cappuccino",
             "description": "Perfect balance of espresso, steamed milk, and foam",
             "price": 4.25,
@@ -193,10 +330,10 @@ async def init_sample_data():
             "available": True,
             "ingredients": ["coffee beans", "milk", "milk foam"],
             "nutritional_info": {"calories": 120, "caffeine_mg": 63},
-            "created_at": datetime.now(timezone.utc)
+            "created_at": now
         },
         {
-            "id": str(uuid.uuid4()),
+            "_id": str(uuid.uuid4()),
             "name": "Latte",
             "description": "Smooth espresso with steamed milk and light foam",
             "price": 4.50,
@@ -205,11 +342,11 @@ async def init_sample_data():
             "available": True,
             "ingredients": ["coffee beans", "steamed milk"],
             "nutritional_info": {"calories": 150, "caffeine_mg": 63},
-            "created_at": datetime.now(timezone.utc)
+            "created_at": now
         },
         # Pastries
         {
-            "id": str(uuid.uuid4()),
+            "_id": str(uuid.uuid4()),
             "name": "Croissant",
             "description": "Buttery, flaky French pastry perfect for breakfast",
             "price": 3.50,
@@ -218,10 +355,10 @@ async def init_sample_data():
             "available": True,
             "ingredients": ["flour", "butter", "yeast", "milk", "eggs"],
             "nutritional_info": {"calories": 231, "fat_g": 12},
-            "created_at": datetime.now(timezone.utc)
+            "created_at": now
         },
         {
-            "id": str(uuid.uuid4()),
+            "_id": str(uuid.uuid4()),
             "name": "Blueberry Muffin",
             "description": "Fresh baked muffin loaded with juicy blueberries",
             "price": 3.25,
@@ -230,11 +367,11 @@ async def init_sample_data():
             "available": True,
             "ingredients": ["flour", "blueberries", "sugar", "eggs", "butter"],
             "nutritional_info": {"calories": 265, "sugar_g": 18},
-            "created_at": datetime.now(timezone.utc)
+            "created_at": now
         },
         # Sandwiches
         {
-            "id": str(uuid.uuid4()),
+            "_id": str(uuid.uuid4()),
             "name": "Club Sandwich",
             "description": "Triple-decker with turkey, bacon, lettuce, and tomato",
             "price": 8.75,
@@ -243,11 +380,11 @@ async def init_sample_data():
             "available": True,
             "ingredients": ["bread", "turkey", "bacon", "lettuce", "tomato", "mayo"],
             "nutritional_info": {"calories": 450, "protein_g": 28},
-            "created_at": datetime.now(timezone.utc)
+            "created_at": now
         },
         # Cakes
         {
-            "id": str(uuid.uuid4()),
+            "_id": str(uuid.uuid4()),
             "name": "Chocolate Cake",
             "description": "Rich, moist chocolate cake with chocolate frosting",
             "price": 5.50,
@@ -256,53 +393,106 @@ async def init_sample_data():
             "available": True,
             "ingredients": ["flour", "cocoa", "sugar", "eggs", "butter", "chocolate"],
             "nutritional_info": {"calories": 365, "sugar_g": 35},
-            "created_at": datetime.now(timezone.utc)
+            "created_at": now
         }
     ]
     
-    await db.products.insert_many(sample_products)
+    await db.products.insert_many(sample_products, ordered=False)
     
     # Create admin user
     admin_user = {
-        "id": str(uuid.uuid4()),
+        "_id": str(uuid.uuid4()),
         "email": "admin@cafe.com",
         "name": "Admin User",
-        "password": hash_password("admin123"),
+        "password": await run_password_task(hash_password, "admin123"),
         "role": "admin",
-        "created_at": datetime.now(timezone.utc)
+        "created_at": now
     }
     await db.users.insert_one(admin_user)
 
+# Databases created before ids moved into _id store an ObjectId _id next to
+# a UUID "id" field in these collections
+ID_COLLECTIONS = ("users", "products", "orders", "reviews")
+
+async def migrate_ids():
+    """Move legacy UUID "id" fields into _id. Safe to run on every startup."""
+    for name in ID_COLLECTIONS:
+        collection = db[name]
+        indexes = await collection.index_information()
+        # Migrated documents have no "id", so the old unique index would reject
+        # every one after the first
+        if "id_1" in indexes:
+            await collection.drop_index("id_1")
+        
+        legacy = {"id": {"$exists": True}}
+        if await collection.count_documents(legacy, limit=1) == 0:
+            continue
+        
+        # Each copy briefly coexists with its original, which the unique email
+        # index would reject; init_indexes recreates it afterwards
+        if "email_1" in indexes:
+            await collection.drop_index("email_1")
+        
+        migrated = 0
+        async for doc in collection.find(legacy):
+            old_id = doc.pop("_id")
+            doc["_id"] = doc.pop("id")
+            try:
+                await collection.insert_one(doc)
+            except DuplicateKeyError:
+                pass  # Copied by an earlier run that stopped before the delete
+            await collection.delete_one({"_id": old_id})
+            migrated += 1
+        logger.info("Moved id to _id on %d %s documents", migrated, name)
+
+# Indexes for the fields every read path filters and sorts on
+async def init_indexes():
+    await db.users.create_index("email", unique=True)
+    await db.products.create_index([("available", 1), ("category", 1)])
+    await db.products.create_index([("name", "text"), ("description", "text")])
+    await db.orders.create_index([("user_id", 1), ("created_at", -1)])
+    await db.orders.create_index([("created_at", -1)])
+    await db.reviews.create_index([("product_id", 1), ("created_at", -1)])
+
 # Routes
 @api_router.get("/")
 async def root():
     return {"message": "Welcome to Café Delights API"}
 
 # Product endpoints
-@api_router.get("/products", response_model=List[Product])
+@api_router.get("/products", response_model=List[ProductListItem])
 async def get_products(category: Optional[ProductCategory] = None):
-    query = {"available": True}
-    if category:
-        query["category"] = category
-    products = await db.products.find(query).to_list(length=None)
-    return [Product(**product) for product in products]
+    cache_key = ("list", category)
+    body = product_cache.get(cache_key)
+    if body is None:
+        query = {"available": True}
+        if category:
+            query["category"] = category
+        products = await db.products.find(query, PRODUCT_LIST_PROJECTION).to_list(length=None)
+        body = product_cache[cache_key] = dump_list(PRODUCT_LIST_ADAPTER, ProductListItem, products)
+    return Response(body, media_type="application/json")
 
 @api_router.get("/products/{product_id}", response_model=Product)
 async def get_product(product_id: str):
-    product = await db.products.find_one({"id": product_id})
-    if not product:
-        raise HTTPException(status_code=404, detail="Product not found")
-    return Product(**product)
+    cache_key = ("product", product_id)
+    body = product_cache.get(cache_key)
+    if body is None:
+        product = await db.products.find_one({"_id": product_id})
+        if not product:
+            raise HTTPException(status_code=404, detail="Product not found")
+        body = product_cache[cache_key] = dump_model(from_db(Product, product))
+    return Response(body, media_type="application/json")
 
 @api_router.post("/products", response_model=Product)
 async def create_product(product: ProductCreate, current_user: User = Depends(get_current_user)):
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=403, detail="Admin access required")
     
-    product_dict = product.dict()
+    product_dict = product.model_dump()
     product_obj = Product(**product_dict)
-    await db.products.insert_one(product_obj.dict())
-    return product_obj
+    await db.products.insert_one(to_db(product_obj))
+    product_cache.clear()
+    return PydanticResponse(product_obj)
 
 # User endpoints
 @api_router.post("/register")
@@ -312,108 +502,150 @@ async def register(user: UserCreate):
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    user_dict = user.dict()
-    user_dict["password"] = hash_password(user.password)
-    user_obj = User(**user_dict)
-    await db.users.insert_one(user_obj.dict())
+    user_obj = User(**user.model_dump(exclude={"password"}))
+    user_doc = to_db(user_obj)
+    user_doc["password"] = await run_password_task(hash_password, user.password)
+    await db.users.insert_one(user_doc)
     
     token = create_token(user_obj.id, user_obj.email, user_obj.role)
-    return {"token": token, "user": user_obj}
+    return {"token": token, "user": user_obj.model_dump(mode="json")}
 
 @api_router.post("/login")
 async def login(credentials: UserLogin):
     user = await db.users.find_one({"email": credentials.email})
-    if not user or user["password"] != hash_password(credentials.password):
+    if not user or not await run_password_task(verify_password, user["password"], credentials.password):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
-    token = create_token(user["id"], user["email"], user["role"])
-    return {"token": token, "user": User(**user)}
+    if password_needs_rehash(user["password"]):
+        new_hash = await run_password_task(hash_password, credentials.password)
+        await db.users.update_one({"_id": user["_id"]}, {"$set": {"password": new_hash}})
+    
+    token = create_token(user["_id"], user["email"], user["role"])
+    return {"token": token, "user": from_db(User, user).model_dump(mode="json", warnings=False)}
 
 @api_router.get("/profile", response_model=User)
 async def get_profile(current_user: User = Depends(get_current_user)):
-    return current_user
+    return PydanticResponse(current_user)
 
 # Order endpoints
 @api_router.post("/orders", response_model=Order)
 async def create_order(order: OrderCreate, current_user: User = Depends(get_current_user)):
-    total_amount = sum(item.price * item.quantity for item in order.items)
+    # Price the order from the catalogue, not from what the client sent
+    product_ids = [item.product_id for item in order.items]
+    cursor = db.products.find(
+        {"_id": {"$in": product_ids}},
+        {"name": 1, "price": 1, "category": 1, "image_url": 1, "available": 1}
+    )
+    products = {product["_id"]: product async for product in cursor}
     
-    order_dict = order.dict()
+    items = []
+    for item in order.items:
+        product = products.get(item.product_id)
+        if product is None or not product.get("available", True):
+            raise HTTPException(status_code=400, detail=f"Product {item.product_id} is not available")
+        items.append(OrderItem(
+            product_id=item.product_id,
+            quantity=item.quantity,
+            price=product["price"],
+            product_name=product["name"],
+            category=product.get("category"),
+            image_url=product.get("image_url")
+        ))
+    total_amount = sum(item.price * item.quantity for item in items)
+    
+    order_dict = order.model_dump()
+    order_dict["items"] = items
     order_dict["user_id"] = current_user.id
     order_dict["total_amount"] = total_amount
+    order_dict["created_at"] = order_dict["updated_at"] = utc_now()
     order_obj = Order(**order_dict)
     
-    await db.orders.insert_one(order_obj.dict())
-    return order_obj
-
-@api_router.get("/orders", response_model=List[Order])
-async def get_orders(current_user: User = Depends(get_current_user)):
+    await db.orders.insert_one(to_db(order_obj))
+    return PydanticResponse(order_obj)
+
+@api_router.get("/orders", response_model=List[OrderSummary])
+async def get_orders(
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=200),
+    current_user: User = Depends(get_current_user)
+):
     query = {"user_id": current_user.id} if current_user.role == UserRole.CUSTOMER else {}
-    orders = await db.orders.find(query).sort("created_at", -1).to_list(length=None)
-    return [Order(**order) for order in orders]
+    cursor = db.orders.find(query, ORDER_LIST_PROJECTION).sort("created_at", -1).skip(skip)
+    # Without a limit the full list is returned, which the order pages rely on
+    if limit is not None:
+        cursor = cursor.limit(limit)
+    orders = await cursor.to_list(length=None)
+    return Response(dump_list(ORDER_LIST_ADAPTER, OrderSummary, orders), media_type="application/json")
+
+@api_router.get("/orders/export")
+async def export_orders(current_user: User = Depends(get_current_user)):
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    # One order per line, streamed as the cursor fetches each batch
+    async def generate():
+        async for order in db.orders.find({}).sort("created_at", -1).batch_size(500):
+            yield dump_model(from_db(Order, order)) + b"\n"
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
 
 @api_router.get("/orders/{order_id}", response_model=Order)
 async def get_order(order_id: str, current_user: User = Depends(get_current_user)):
-    order = await db.orders.find_one({"id": order_id})
+    order = await db.orders.find_one({"_id": order_id})
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
     
     if current_user.role == UserRole.CUSTOMER and order["user_id"] != current_user.id:
         raise HTTPException(status_code=403, detail="Access denied")
     
-    return Order(**order)
+    return PydanticResponse(from_db(Order, order))
 
-@api_router.put("/orders/{order_id}/status")
+@api_router.put("/orders/{order_id}/status", response_model=Order)
 async def update_order_status(order_id: str, status: OrderStatus, current_user: User = Depends(get_current_user)):
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=403, detail="Admin access required")
     
-    result = await db.orders.update_one(
-        {"id": order_id},
-        {"$set": {"status": status, "updated_at": datetime.now(timezone.utc)}}
+    order = await db.orders.find_one_and_update(
+        {"_id": order_id},
+        {"$set": {"status": status}, "$currentDate": {"updated_at": True}},
+        return_document=ReturnDocument.AFTER
     )
     
-    if result.matched_count == 0:
+    if order is None:
         raise HTTPException(status_code=404, detail="Order not found")
     
-    return {"message": "Order status updated"}
+    return PydanticResponse(from_db(Order, order))
 
 # Review endpoints
 @api_router.post("/reviews", response_model=Review)
 async def create_review(review: ReviewCreate, current_user: User = Depends(get_current_user)):
     # Check if product exists
-    product = await db.products.find_one({"id": review.product_id})
+    product = await db.products.find_one({"_id": review.product_id}, {"_id": 1})
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
-    review_dict = review.dict()
+    review_dict = review.model_dump()
     review_dict["user_id"] = current_user.id
     review_dict["user_name"] = current_user.name
     review_obj = Review(**review_dict)
     
-    await db.reviews.insert_one(review_obj.dict())
-    return review_obj
+    await db.reviews.insert_one(to_db(review_obj))
+    return PydanticResponse(review_obj)
 
 @api_router.get("/products/{product_id}/reviews", response_model=List[Review])
 async def get_product_reviews(product_id: str):
     reviews = await db.reviews.find({"product_id": product_id}).sort("created_at", -1).to_list(length=None)
-    return [Review(**review) for review in reviews]
+    return Response(dump_list(REVIEW_LIST_ADAPTER, Review, reviews), media_type="application/json")
 
 # Search endpoint
-@api_router.get("/search/products", response_model=List[Product])
+@api_router.get("/search/products", response_model=List[ProductListItem])
 async def search_products(q: str):
-    products = await db.products.find({
-        "$and": [
-            {"available": True},
-            {
-                "$or": [
-                    {"name": {"$regex": q, "$options": "i"}},
-                    {"description": {"$regex": q, "$options": "i"}}
-                ]
-            }
-        ]
-    }).to_list(length=None)
-    return [Product(**product) for product in products]
+    # Backed by the products text index; best matches first
+    products = await db.products.find(
+        {"available": True, "$text": {"$search": q}},
+        PRODUCT_LIST_PROJECTION
+    ).sort([("score", {"$meta": "textScore"})]).to_list(length=None)
+    return Response(dump_list(PRODUCT_LIST_ADAPTER, ProductListItem, products), media_type="application/json")
 
 # Dashboard endpoint for admin
 @api_router.get("/dashboard/stats")
@@ -421,10 +653,12 @@ async def get_dashboard_stats(current_user: User = Depends(get_current_user)):
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=403, detail="Admin access required")
     
-    total_products = await db.products.count_documents({"available": True})
-    total_orders = await db.orders.count_documents({})
-    total_users = await db.users.count_documents({"role": "customer"})
-    pending_orders = await db.orders.count_documents({"status": "pending"})
+    total_products, total_orders, total_users, pending_orders = await asyncio.gather(
+        db.products.count_documents({"available": True}),
+        db.orders.count_documents({}),
+        db.users.count_documents({"role": "customer"}),
+        db.orders.count_documents({"status": "pending"})
+    )
     
     return {
         "total_products": total_products,
@@ -453,9 +687,20 @@ logger = logging.getLogger(__name__)
 
 @app.on_event("startup")
 async def startup_event():
+    global password_executor
+    # spawn rather than fork: the event loop and Mongo client are not fork-safe
+    password_executor = ProcessPoolExecutor(
+        max_workers=os.cpu_count(),
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+    await migrate_ids()
     await init_sample_data()
     logger.info("Sample data initialized")
+    await init_indexes()
+    logger.info("Indexes ensured")
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+    await client.close()
+    if password_executor is not None:
+        password_executor.shutdown()
\ No newline at end of file